@@ -8,22 +8,38 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
-from mo_dots import wrap
+from active_data.telemetry import query_shape
+from mo_dots import is_data, wrap
 from mo_files import File
+from mo_future import is_text
 from mo_json import value2json
 from mo_logs import Log
 from mo_times.dates import Date
 
 request_log_queue = None
+telemetry = None  # Telemetry, WHEN THE request_logs ARE SAMPLED
 
 OVERVIEW = File("active_data/public/index.html").read()
 
 
-def record_request(request, query_, data, error):
+def record_request(request, query_, data, error, timing=None, duration=None, jx_query=None):
+    """
+    :param timing: OPTIONAL MAP FROM STEP NAME TO SECONDS (SEE Span.stats())
+    :param duration: OPTIONAL SECONDS THE REQUEST TOOK, ADDED TO THE LATENCY HISTOGRAMS
+    :param jx_query: OPTIONAL JX QUERY THAT query_ WAS TRANSLATED TO (eg FROM /sql), THE LATENCY HISTOGRAMS ARE BY ITS SHAPE
+    """
     try:
         if request_log_queue == None:
             return
 
+        if telemetry:
+            if duration is not None:
+                shaped = query_ if jx_query is None else jx_query
+                table = shaped["from"] if is_data(shaped) and is_text(shaped["from"]) else None
+                telemetry.add(request.path, table, query_shape(shaped), duration)
+            if not telemetry.should_log(duration, error):
+                return
+
         if data and len(data)>10000:
             data = data[:10000]
 
@@ -36,7 +52,9 @@ def record_request(request, query_, data, error):
             "remote_addr": request.remote_addr,
             "query_text": value2json(query_),
             "data": data,
-            "error": value2json(error)
+            "error": value2json(error),
+            "timing": timing,
+            "duration": duration
         })
         log["from"] = request.headers.get('from')
         request_log_queue.add({"value": log})
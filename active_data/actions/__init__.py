@@ -13,6 +13,7 @@ from flask import Response
 
 from active_data import record_request
 from active_data.actions import save_query
+from active_data.replica import replicas
 from jx_base import container
 from jx_elasticsearch.meta import ElasticsearchMetadata, EXPECTING_SNOWFLAKE
 from jx_python.containers.list_usingPythonList import ListContainer
@@ -37,7 +38,7 @@ def send_error(active_data_timer, body, e):
     if QUERY_TOO_LARGE in e:
         status = 413
 
-    record_request(flask.request, None, body, e)
+    record_request(flask.request, None, body, e, duration=active_data_timer.duration.seconds)
     Log.warning("Could not process\n{{body}}", body=body.decode("latin1"), cause=e)
     e = e.__data__()
     e.meta.timing.total = active_data_timer.duration.seconds
@@ -131,6 +132,9 @@ def find_container(frum, after):
     :return:
     """
     global namespace
+    if is_text(frum) and frum in replicas:
+        return replicas[frum]
+
     if not namespace:
         if not container.config.default.settings:
             Log.error(
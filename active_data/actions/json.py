@@ -22,10 +22,11 @@ from mo_math import is_number, is_integer
 from mo_threads.threads import RegisterThread
 from mo_times.timer import Timer
 from pyLibrary import convert
-from pyLibrary.env.flask_wrappers import cors_wrapper
+from pyLibrary.env.flask_wrappers import cors_wrapper, gzip_wrapper
 
 _keep_import = value2json
 
+@gzip_wrapper
 @cors_wrapper
 def get_raw_json(path):
     with RegisterThread():
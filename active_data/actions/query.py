@@ -14,7 +14,7 @@ from flask import Response
 from active_data import record_request
 from active_data.actions import QUERY_TOO_LARGE, find_container, save_query, send_error, test_mode_wait
 from jx_base.container import Container
-from jx_python import jx
+from jx_python import columnar, jx
 from mo_files import File
 from mo_future import binary_type
 from mo_json import json2value, value2json
@@ -23,12 +23,13 @@ from mo_logs.strings import unicode2utf8, utf82unicode
 import mo_math
 from mo_threads.threads import RegisterThread
 from mo_times.timer import Timer
-from pyLibrary.env.flask_wrappers import cors_wrapper
+from pyLibrary.env.flask_wrappers import cors_wrapper, gzip_wrapper
 
 BLANK = unicode2utf8(File("active_data/public/error.html").read())
 QUERY_SIZE_LIMIT = 10*1024*1024
 
 
+@gzip_wrapper
 @cors_wrapper
 def jx_query(path):
     with RegisterThread():
@@ -51,13 +52,12 @@ def jx_query(path):
                     request_body = flask.request.get_data().strip()
                     text = utf82unicode(request_body)
                     data = json2value(text)
-                    record_request(flask.request, data, None, None)
                     if data.meta.testing:
                         test_mode_wait(data)
 
-                translate_timer = Timer("translate", silent=False)
+                translate_timer = Timer("translate", silent=False, trace=bool(data.meta.profile))
                 with translate_timer:
-                    with Timer("find container"):
+                    with Timer("find_container"):
                         frum = find_container(data['from'], after=None)
                     result = jx.run(data, container=frum)
 
@@ -76,9 +76,16 @@ def jx_query(path):
                 result.meta.timing.translate = mo_math.round(translate_timer.duration.seconds, digits=4)
                 result.meta.timing.save = mo_math.round(save_timer.duration.seconds, digits=4)
                 result.meta.timing.total = "{{TOTAL_TIME}}"  # TIMING PLACEHOLDER
+                if translate_timer.span:
+                    result.meta.profile = translate_timer.span.__data__()
 
                 with Timer("jsonification", silent=True) as json_timer:
-                    response_data = unicode2utf8(value2json(result))
+                    if result.meta.format == "columnar":
+                        # BINARY, SO THE TIMING PLACEHOLDER CAN NOT BE REPLACED LATER
+                        result.meta.timing.total = mo_math.round(query_timer.duration.seconds, digits=4)
+                        response_data = columnar.encode(result)
+                    else:
+                        response_data = unicode2utf8(value2json(result))
 
             with Timer("post timer", silent=True):
                 # IMPORTANT: WE WANT TO TIME OF THE JSON SERIALIZATION, AND HAVE IT IN THE JSON ITSELF.
@@ -89,6 +96,14 @@ def jx_query(path):
                 )
                 response_data = response_data.replace(b'"total":"{{TOTAL_TIME}}"', timing_replacement)
                 Log.note("Response is {{num}} bytes in {{duration}}", num=len(response_data), duration=query_timer.duration)
+                record_request(
+                    flask.request,
+                    data,
+                    None,
+                    None,
+                    timing=translate_timer.span.stats() if translate_timer.span else None,
+                    duration=query_timer.duration.seconds
+                )
 
                 return Response(
                     response_data,
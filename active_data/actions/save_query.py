@@ -8,6 +8,7 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
+from collections import OrderedDict
 import hashlib
 
 from flask import Response
@@ -21,15 +22,19 @@ from mo_kwargs import override
 from mo_logs import Log
 from mo_logs.exceptions import Except
 from mo_logs.strings import unicode2utf8
-from mo_threads import Thread
+from mo_threads import Lock, Thread, Till
 from mo_threads.threads import RegisterThread
 from mo_times.dates import Date
+from mo_times.durations import Duration, HOUR
 from pyLibrary import convert
 from pyLibrary.env.elasticsearch import Cluster
 from pyLibrary.env.flask_wrappers import cors_wrapper
+from pyLibrary.meta import cache
 
+DEBUG = False
 HASH_BLOCK_SIZE = 100
 DATA_TYPE = "query"
+CACHE_SIZE = 1000  # SAVED QUERIES KEPT IN MEMORY, FOR find() AND save()
 
 query_finder = None
 
@@ -67,7 +72,16 @@ def find_query(hash):
 
 class SaveQueries(object):
     @override
-    def __init__(self, host, index, type=DATA_TYPE, max_size=10, batch_size=10, kwargs=None):
+    def __init__(
+        self,
+        host,
+        index,
+        type=DATA_TYPE,
+        max_size=10,
+        batch_size=10,
+        update_interval="minute",  # HOW OFTEN THE last_used OF THE FOUND QUERIES IS SENT TO ES
+        kwargs=None
+    ):
         """
         settings ARE FOR THE ELASTICSEARCH INDEX
         """
@@ -81,29 +95,48 @@ class SaveQueries(object):
         self.queue = es.threaded_queue(max_size=max_size, batch_size=batch_size, period=1)
         self.es = jx_elasticsearch.new_instance(es.settings)
 
+        self.locker = Lock("saved queries")
+        self.recent = OrderedDict()  # MAP FROM QUERY JSON TO hash, LEAST RECENTLY USED FIRST
+        self.used = {}  # MAP FROM hash TO (query, create_time, last_used) WAITING TO BE SENT TO ES
+        self.update_interval = Duration(update_interval)
+        self.updater = Thread.run("update saved query last_used", self._update_loop)
+
     def find(self, hash):
+        found = self._find(hash)
+        if not found:
+            # _find() CACHES THE MISS, BUT A RECENT save() MAY NOT BE IN ES YET
+            with self.locker:
+                for query, h in self.recent.items():
+                    if h == hash:
+                        return query
+            return None
+        hash, query, create_time = found
+        self._remember(query, hash)
+
+        # last_used IS SENT LATER, IN BULK
+        with self.locker:
+            self.used[hash] = (query, create_time, Date.now())
+        return query
+
+    @cache(duration=HOUR, max_size=CACHE_SIZE)
+    def _find(self, hash):
+        """
+        :return: (hash, query, create_time) TRIPLE, OR None IF NOT FOUND
+        """
         result = self.es.query({
-            "select": ["hash", "query"],
+            "select": ["hash", "query", "create_time"],
             "from": "saved_queries",
             "where": {"prefix": {"hash": hash}},
             "format": "list"
         })
 
         try:
-            hash = result.data[0].hash
-            query = wrap(result.data[0]).query
-            if len(query) == 0:
+            found = wrap(result.data[0])
+            if len(found.query) == 0:
                 return None
         except Exception:
             return None
-
-        self.es.update({
-            "update": self.es.name,
-            "set": {"last_used": Date.now()},
-            "where": {"eq": {"hash": hash}}
-        })
-
-        return query
+        return found.hash, found.query, found.create_time
 
     def save(self, query):
         """
@@ -113,6 +146,14 @@ class SaveQueries(object):
         """
         query.meta = None
         json = convert.value2json(query)
+
+        with self.locker:
+            best = self.recent.get(json)
+        if best:
+            # SAVED (OR FOUND) RECENTLY, NO NEED TO ASK ES
+            self._remember(json, best)
+            return best
+
         hash = unicode2utf8(json)
 
         # TRY MANY HASHES AT ONCE
@@ -132,6 +173,7 @@ class SaveQueries(object):
 
         for e in Cube(select=existing.select, edges=existing.edges, data=existing.data).values():
             if e.query == json:
+                self._remember(json, e.hash)
                 return e.hash
             available[e.hash] = False
 
@@ -147,12 +189,54 @@ class SaveQueries(object):
                 "query": json
             }
         })
+        self._remember(json, best)
 
         Log.note("Saved {{json}} query as {{hash}}", json=json, hash=best)
 
         return best
 
+    def _remember(self, json, hash):
+        with self.locker:
+            self.recent.pop(json, None)
+            self.recent[json] = hash
+            while len(self.recent) > CACHE_SIZE:
+                self.recent.popitem(last=False)
+
+    def _update_loop(self, please_stop):
+        while not please_stop:
+            (Till(seconds=self.update_interval.seconds) | please_stop).wait()
+            try:
+                self._send_last_used()
+            except Exception as e:
+                Log.warning("Problem updating saved query last_used", cause=e)
+
+    def _send_last_used(self):
+        """
+        SEND THE last_used OF THE QUERIES FOUND SINCE LAST TIME
+        THE WHOLE DOCUMENT IS SENT, SO IT GOES THROUGH THE SAME BULK queue AS save()
+        """
+        with self.locker:
+            used, self.used = self.used, {}
+        for hash, (query, create_time, last_used) in used.items():
+            self.queue.add({
+                "id": hash,
+                "value": {
+                    "hash": hash,
+                    "create_time": create_time,
+                    "last_used": last_used,
+                    "query": query
+                }
+            })
+        DEBUG and Log.note("Sent last_used for {{num}} saved queries", num=len(used))
+
     def stop(self):
+        self.updater.stop()
+        self.updater.join()
+        try:
+            self._send_last_used()
+        except Exception as e:
+            pass
+
         try:
             self.queue.add(Thread.STOP)  # BE PATIENT, LET REST OF MESSAGE BE SENT
         except Exception as e:
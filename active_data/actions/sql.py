@@ -8,6 +8,9 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
+from collections import OrderedDict
+import re
+
 import flask
 from flask import Response
 
@@ -23,12 +26,14 @@ from mo_logs.exceptions import Except
 from mo_logs.strings import unicode2utf8
 import mo_math
 from mo_testing.fuzzytestcase import assertAlmostEqual
+from mo_threads import Lock
 from mo_threads.threads import RegisterThread
 from mo_times.timer import Timer
 import moz_sql_parser
-from pyLibrary.env.flask_wrappers import cors_wrapper
+from pyLibrary.env.flask_wrappers import cors_wrapper, gzip_wrapper
 
 
+@gzip_wrapper
 @cors_wrapper
 def sql_query(path):
     with RegisterThread():
@@ -53,7 +58,6 @@ def sql_query(path):
                     request_body = flask.request.get_data().strip()
                     text = utf82unicode(request_body)
                     data = json2value(text)
-                    record_request(flask.request, data, None, None)
 
                 translate_timer = Timer("translate", silent=True)
                 with translate_timer:
@@ -94,6 +98,7 @@ def sql_query(path):
                                      b', "jsonification": ' + str(mo_math.round(json_timer.duration.seconds, digits=4))
                 response_data = response_data.replace(b'"total":"{{TOTAL_TIME}}"', timing_replacement)
                 Log.note("Response is {{num}} bytes in {{duration}}", num=len(response_data), duration=query_timer.duration)
+                record_request(flask.request, data, None, None, duration=query_timer.duration.seconds, jx_query=jx_query)
 
                 return Response(
                     response_data,
@@ -108,9 +113,46 @@ def sql_query(path):
 
 
 KNOWN_SQL_AGGREGATES = {"sum", "count", "avg", "median", "percentile"}
+SQL_CACHE_SIZE = 1000  # NUMBER OF PARSED SQL STATEMENTS TO REMEMBER
+
+sql_cache = OrderedDict()  # MAP FROM NORMALIZED SQL TO JX QUERY (AS JSON), LEAST RECENTLY USED FIRST
+sql_cache_locker = Lock("sql cache")
+# QUOTED STRINGS AND IDENTIFIERS ARE KEPT AS-IS, WHITESPACE BETWEEN THEM IS COLLAPSED
+TOKENS = re.compile(r"""('(?:''|\\.|[^'])*'|"(?:""|\\.|[^"])*"|`(?:``|\\.|[^`])*`)|(\s+)""")
+
+
+def normalize_sql(sql):
+    """
+    :return: sql WITH EACH RUN OF WHITESPACE (OUTSIDE OF QUOTES) AS ONE SPACE (OR ONE NEWLINE, TO END COMMENTS)
+    """
+    def space(match):
+        quoted, white = match.groups()
+        if quoted:
+            return quoted
+        return "\n" if "\n" in white else " "
+
+    return TOKENS.sub(space, sql.strip().rstrip(";").rstrip())
 
 
 def parse_sql(sql):
+    """
+    :return: THE JX QUERY FOR sql (A NEW COPY EACH CALL)
+    """
+    key = normalize_sql(sql)
+    with sql_cache_locker:
+        json = sql_cache.pop(key, None)
+        if json is not None:
+            sql_cache[key] = json
+    if json is None:
+        json = value2json(_parse_sql(sql))
+        with sql_cache_locker:
+            sql_cache[key] = json
+            while len(sql_cache) > SQL_CACHE_SIZE:
+                sql_cache.popitem(last=False)
+    return json2value(json)
+
+
+def _parse_sql(sql):
     query = wrap(moz_sql_parser.parse(sql))
     redundant_select = []
     # PULL OUT THE AGGREGATES
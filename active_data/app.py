@@ -26,8 +26,11 @@ from active_data.actions.query import jx_query
 from active_data.actions.save_query import SaveQueries, find_query
 from active_data.actions.sql import sql_query
 from active_data.actions.static import download, send_favicon
+from active_data.replica import Replica
+from active_data.telemetry import Telemetry
 from jx_base import container
-from mo_dots import is_data
+from jx_python import parallel
+from mo_dots import is_data, listwrap, set_default
 from mo_files import File, TempFile
 from mo_future import text_type
 from mo_logs import Log, constants, startup
@@ -109,6 +112,8 @@ def setup():
         ]
     )
 
+    # DO NOT fork THE THREADED SERVER FOR BIG LIST QUERIES, UNLESS config.constants SAYS SO
+    parallel.PARALLEL_THRESHOLD = 0
     constants.set(config.constants)
     Log.start(config.debug)
 
@@ -117,6 +122,9 @@ def setup():
         cluster = elasticsearch.Cluster(config.request_logs)
         request_logger = cluster.get_or_create_index(config.request_logs)
         active_data.request_log_queue = request_logger.threaded_queue(max_size=2000)
+        if config.request_logs.sampling:
+            # ONLY SAMPLED, SLOW, AND FAILING REQUESTS ARE LOGGED IN FULL; THE REST ARE HISTOGRAMS
+            active_data.telemetry = Telemetry(queue=active_data.request_log_queue, kwargs=config.request_logs.sampling)
 
     if config.dockerflow:
         def backend_check():
@@ -130,6 +138,11 @@ def setup():
         "settings": config.elasticsearch.copy()
     }
 
+    # LOCAL COPIES OF POPULAR SLICES, QUERIED BY NAME
+    for r in listwrap(config.replicas):
+        r.source = set_default(r.source, config.elasticsearch)
+        Replica(r)
+
     # TRIGGER FIRST INSTANCE
     if config.saved_queries:
         setattr(save_query, "query_finder", SaveQueries(config.saved_queries))
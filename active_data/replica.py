@@ -0,0 +1,157 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import jx_elasticsearch
+from jx_base.container import Container
+from jx_python import jx
+from jx_sqlite import Container as SqliteContainer
+from mo_dots import wrap
+from mo_kwargs import override
+from mo_logs import Log
+from mo_threads import Lock, Thread, Till
+from mo_times import Date, Duration
+from pyLibrary.sql.sqlite import Sqlite
+
+DEBUG = False
+PAGE_SIZE = 10000  # MAXIMUM NUMBER OF RECORDS PULLED PER ES REQUEST
+
+replicas = {}  # MAP FROM NAME TO Replica
+
+
+class Replica(Container):
+    """
+    LOCAL COPY OF THE FILTERED RECORDS OF AN ELASTICSEARCH ALIAS, IN A jx_sqlite Container
+    A THREAD PULLS THE RECORDS WITH A NEWER timestamp EVERY interval, AND
+    REMOVES THE RECORDS THAT NO LONGER MATCH where (eg RELATIVE DATES)
+    """
+
+    @override
+    def __init__(
+        self,
+        name,  # NAME USED IN THE QUERY "from" CLAUSE
+        source,  # SETTINGS FOR THE ELASTICSEARCH ALIAS, OR A Container
+        where=True,  # JX EXPRESSION FOR THE RECORDS TO KEEP
+        timestamp="etl.timestamp",  # MONOTONIC PROPERTY, USED TO FIND NEW RECORDS
+        interval="minute",  # TIME BETWEEN REFRESHES
+        page_size=PAGE_SIZE,
+        filename=None,  # SQLITE FILE FOR THE REPLICA (DEFAULT IS IN MEMORY)
+        kwargs=None
+    ):
+        self.name = name
+        if isinstance(source, Container):
+            self.source = source
+        else:
+            self.source = jx_elasticsearch.new_instance(source)
+        self.where = wrap(where)
+        self.timestamp = timestamp
+        self.interval = Duration(interval)
+        self.page_size = page_size
+        self.container = SqliteContainer(name, db=Sqlite(filename))
+
+        self.locker = Lock("replica " + name)
+        self.last = None  # LARGEST timestamp COPIED SO FAR
+        self.last_refresh = None  # WHEN THE LAST REFRESH FINISHED
+
+        replicas[name] = self
+        self.worker = Thread.run("refresh replica " + name, self._refresh_loop)
+
+    @property
+    def namespace(self):
+        return self.container.namespace
+
+    @property
+    def schema(self):
+        return self.container.schema
+
+    def get_table(self, name):
+        return self.container.get_table(name)
+
+    def query(self, query):
+        """
+        ANSWER query FROM THE REPLICA, WITH ITS STALENESS IN meta.replica
+        """
+        result = self.container.query(query)
+        now = Date.now()
+        result.meta.replica = {
+            "name": self.name,
+            "timestamp": self.last,
+            "refreshed": self.last_refresh,
+            "staleness": (now - self.last_refresh).seconds if self.last_refresh else None
+        }
+        return result
+
+    def refresh(self):
+        """
+        PULL THE NEW RECORDS FROM ELASTICSEARCH
+        :return: NUMBER OF RECORDS ADDED
+        """
+        with self.locker:
+            total = 0
+            while True:
+                where = [self.where]
+                if self.last is not None:
+                    where.append({"gt": {self.timestamp: self.last}})
+                result = jx.run({
+                    "from": self.source.name,
+                    "select": ".",
+                    "where": {"and": where},
+                    "sort": self.timestamp,
+                    "limit": self.page_size,
+                    "format": "list"
+                }, container=self.source)
+                docs, last, more = _page(result.data, self.timestamp, self.page_size)
+                if docs:
+                    self.container.insert(docs)
+                    self.last = last
+                    total += len(docs)
+                if not more:
+                    break
+
+            # RELATIVE DATES IN where MAY EXCLUDE RECORDS WE ALREADY HAVE
+            self.container.delete({"not": self.where})
+            self.last_refresh = Date.now()
+            DEBUG and Log.note("replica {{name}} got {{num}} new records", name=self.name, num=total)
+            return total
+
+    def _refresh_loop(self, please_stop):
+        while not please_stop:
+            try:
+                self.refresh()
+            except Exception as e:
+                Log.warning("Problem refreshing replica {{name}}", name=self.name, cause=e)
+            (Till(seconds=self.interval.seconds) | please_stop).wait()
+
+
+def _page(docs, timestamp, page_size):
+    """
+    :param docs: ONE PAGE OF RECORDS, SORTED BY timestamp
+    :param timestamp: NAME OF THE MONOTONIC PROPERTY
+    :param page_size: THE PAGE SIZE REQUESTED
+    :return: (docs, last, more) TRIPLE - THE RECORDS TO INSERT, THEIR LARGEST
+             timestamp, AND True IF THERE MAY BE MORE RECORDS
+    """
+    docs = wrap(docs)
+    if not docs:
+        return [], None, False
+    last = docs.last()[timestamp]
+    if len(docs) < page_size:
+        return docs, last, False
+
+    # THE RECORDS WITH THE LAST timestamp MAY CONTINUE ON THE NEXT PAGE, GET THEM THEN
+    complete = [d for d in docs if d[timestamp] != last]
+    if not complete:
+        Log.warning(
+            "More than {{num}} records have {{timestamp}}=={{value}}, some may be missed",
+            num=page_size,
+            timestamp=timestamp,
+            value=last
+        )
+        return docs, last, True
+    return complete, complete[-1][timestamp], True
@@ -0,0 +1,207 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import hashlib
+import random
+
+from mo_dots import is_data, is_list
+from mo_future import is_text, sort_using_key
+from mo_json import value2json
+from mo_kwargs import override
+from mo_logs import Log
+from mo_logs.strings import unicode2utf8
+from mo_threads import Lock, Thread, Till
+from mo_times import Date, Duration
+
+DEBUG = False
+SUB_BITS = 7  # EACH BUCKET IS WITHIN 1/2^SUB_BITS (<1%) OF THE VALUES IT HOLDS
+RESOLUTION = 1000000  # HISTOGRAMS COUNT MICROSECONDS
+PERCENTILES = [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]
+IGNORED = ["meta", "limit", "format"]  # QUERY PROPERTIES THAT DO NOT CHANGE THE SHAPE
+
+
+class Histogram(object):
+    """
+    LOG-LINEAR (HDR-STYLE) HISTOGRAM OF DURATIONS
+    VALUES ARE ROUNDED DOWN TO THEIR TOP SUB_BITS BITS, SO THE NUMBER OF
+    BUCKETS GROWS WITH THE LOG OF THE RANGE, AND THE PERCENTILES KEEP THEIR
+    RELATIVE PRECISION
+    """
+    __slots__ = ["buckets", "count", "total", "min", "max"]
+
+    def __init__(self):
+        self.buckets = {}  # MAP FROM BUCKET LOWER BOUND (MICROSECONDS) TO COUNT
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        value = int(seconds * RESOLUTION)
+        shift = max(0, value.bit_length() - SUB_BITS)
+        bucket = (value >> shift) << shift
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, percent):
+        """
+        :param percent: NUMBER FROM 0 TO 1
+        :return: LOWER BOUND OF THE BUCKET HOLDING THE percent-th VALUE, IN SECONDS
+        """
+        if not self.count:
+            return None
+        rank = percent * self.count
+        seen = 0
+        for bucket in sorted(self.buckets.keys()):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return max(self.min, bucket / RESOLUTION)
+        return self.max
+
+    def __data__(self):
+        output = {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(b): c for b, c in self.buckets.items()}
+        }
+        for name, percent in PERCENTILES:
+            output[name] = self.percentile(percent)
+        return output
+
+
+class Telemetry(object):
+    """
+    KEEP LATENCY HISTOGRAMS PER (endpoint, table, query shape), AND DECIDE
+    WHICH REQUESTS ARE LOGGED IN FULL. THE HISTOGRAMS ARE SENT TO THE
+    REQUEST LOG EVERY interval, AND RESET
+    """
+
+    @override
+    def __init__(
+        self,
+        queue,  # WHERE THE HISTOGRAMS (AND REQUESTS) ARE SENT
+        rate=0.01,  # FRACTION OF NORMAL REQUESTS LOGGED IN FULL
+        slow="5second",  # REQUESTS SLOWER THAN THIS ARE ALWAYS LOGGED
+        errors=True,  # LOG ALL FAILING REQUESTS
+        interval="minute",  # TIME BETWEEN HISTOGRAM FLUSHES
+        kwargs=None
+    ):
+        self.queue = queue
+        self.rate = rate
+        self.slow = Duration(slow).seconds
+        self.errors = errors
+        self.interval = Duration(interval)
+        self.locker = Lock("telemetry")
+        self.histograms = {}  # MAP FROM (endpoint, table, shape) TO Histogram
+        self.start = Date.now()
+        self.worker = Thread.run("telemetry", self._flush_loop)
+
+    def add(self, endpoint, table, shape, seconds):
+        key = (endpoint, table, shape)
+        with self.locker:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.add(seconds)
+
+    def should_log(self, seconds, error):
+        """
+        :return: True IF THE REQUEST SHOULD BE LOGGED IN FULL
+        """
+        if error:
+            return self.errors
+        if seconds is not None and seconds >= self.slow:
+            return True
+        return random.random() < self.rate
+
+    def flush(self):
+        """
+        SEND THE HISTOGRAMS, AND START NEW ONES
+        :return: NUMBER OF HISTOGRAMS SENT
+        """
+        with self.locker:
+            histograms, self.histograms = self.histograms, {}
+            start, self.start = self.start, Date.now()
+
+        for (endpoint, table, shape), histogram in sort_using_key(histograms.items(), lambda p: p[0]):
+            self.queue.add({"value": {
+                "timestamp": start,
+                "interval": (self.start - start).seconds,
+                "path": endpoint,
+                "from": table,
+                "query_shape": shape,
+                "latency": histogram.__data__()
+            }})
+        DEBUG and Log.note("flushed {{num}} histograms", num=len(histograms))
+        return len(histograms)
+
+    def _flush_loop(self, please_stop):
+        while not please_stop:
+            (Till(seconds=self.interval.seconds) | please_stop).wait()
+            try:
+                self.flush()
+            except Exception as e:
+                Log.warning("Problem sending request histograms", cause=e)
+
+    def stop(self):
+        self.worker.stop()
+        self.worker.join()
+
+
+def query_shape(query):
+    """
+    :param query: JX QUERY
+    :return: HASH OF THE QUERY, WITH THE where LITERALS, limit, format AND meta REMOVED
+    """
+    if not is_data(query):
+        return None
+    shape = {k: v for k, v in query.items() if k not in IGNORED}
+    if shape.get("where") is not None:
+        shape["where"] = _where_shape(shape["where"])
+    return hashlib.sha1(unicode2utf8(value2json(shape))).hexdigest()[:12]
+
+
+def _where_shape(expr):
+    """
+    REPLACE THE LITERALS OF {op: {variable: literal}}, {op: [variable, literal]}
+    AND {"literal": value} (AS FROM THE SQL PARSER) WITH "?"
+    """
+    if is_list(expr):
+        return [_where_shape(e) for e in expr]
+    if not is_data(expr):
+        return expr if is_text(expr) else "?"
+    output = {}
+    for op, term in expr.items():
+        if op == "literal":
+            output[op] = "?"
+        elif is_data(term):
+            output[op] = {
+                k: _where_shape(v) if is_data(v) or (is_list(v) and v and is_data(v[0])) else "?"
+                for k, v in term.items()
+            }
+        elif is_list(term):
+            output[op] = [_where_shape(t) for t in term]
+        else:
+            output[op] = term
+    return output
@@ -0,0 +1,142 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Signal, Thread, Till
+from mo_times import SECOND
+from pyLibrary.meta import cache
+
+
+class TestCache(FuzzyTestCase):
+    def test_lru_eviction(self):
+        calls = []
+
+        class Thing(object):
+            @cache(max_size=2)
+            def get(self, key):
+                calls.append(key)
+                return key * 2
+
+        thing = Thing()
+        for k in [1, 2, 1, 3, 1, 2]:
+            self.assertEqual(thing.get(k), k * 2)
+        # 2 IS EVICTED BY 3, BECAUSE 1 WAS USED MORE RECENTLY
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual((Thing.get.cache.hits, Thing.get.cache.misses, Thing.get.cache.evictions), (2, 4, 2))
+
+    def test_byte_eviction(self):
+        @cache(max_bytes=25)
+        def get(key):
+            return key * 10
+
+        get("a")
+        get("b")
+        get("c")
+        self.assertEqual(get.cache.evictions, 1)
+        get("b")
+        self.assertEqual(get.cache.hits, 1)
+
+    def test_expiry(self):
+        calls = []
+
+        @cache(duration=0.1 * SECOND)
+        def get(key):
+            calls.append(key)
+            return key
+
+        get(1)
+        get(1)
+        Till(seconds=0.2).wait()
+        get(1)
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(get.cache.expirations, 1)
+
+    def test_exceptions_are_cached(self):
+        calls = []
+
+        @cache
+        def get(key):
+            calls.append(key)
+            raise Exception("problem")
+
+        self.assertRaises(Exception, get, 1)
+        self.assertRaises(Exception, get, 1)
+        self.assertEqual(calls, [1])
+
+    def test_single_flight(self):
+        calls = []
+        go = Signal()
+
+        @cache(lock=True)
+        def get(key):
+            calls.append(key)
+            go.wait()
+            return key
+
+        results = []
+        threads = [
+            Thread.run("get " + str(i), lambda please_stop: results.append(get(42)))
+            for i in range(5)
+        ]
+        Till(seconds=0.2).wait()
+        go.go()
+        for t in threads:
+            t.join()
+        self.assertEqual(calls, [42])
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual((get.cache.misses, get.cache.hits), (1, 4))
+
+    def test_none_is_cached(self):
+        calls = []
+
+        @cache
+        def get(key):
+            calls.append(key)
+            return None
+
+        self.assertEqual(get(1), None)
+        self.assertEqual(get(1), None)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((get.cache.hits, get.cache.misses), (1, 1))
+
+    def test_thread_safe_without_lock(self):
+        # lock=False ONLY MEANS func MAY RUN CONCURRENTLY, THE CACHE IS STILL SAFE
+        @cache(max_size=10)
+        def get(key):
+            return key
+
+        def worker(please_stop):
+            for i in range(2000):
+                get(i % 37)
+
+        threads = [Thread.run("worker " + str(i), worker) for i in range(4)]
+        for t in threads:
+            t.join()
+        self.assertEqual(get.cache.hits + get.cache.misses, 8000)
+        self.assertEqual(len(get.cache._cache_for_get.elements), 10)
+
+    def test_lock_serializes_calls(self):
+        running = []
+        overlap = []
+
+        @cache(lock=True)
+        def get(key):
+            running.append(key)
+            overlap.append(len(running))
+            Till(seconds=0.05).wait()
+            running.remove(key)
+            return key
+
+        threads = [Thread.run("get " + str(i), lambda please_stop, i=i: get(i)) for i in range(4)]
+        for t in threads:
+            t.join()
+        self.assertEqual(max(overlap), 1)
@@ -0,0 +1,58 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import zlib
+
+from jx_python import columnar
+from jx_python.columnar import DICTIONARY, JSON, MAGIC, NUMBERS, _block_kind
+from mo_dots import Data
+from mo_json import value2json
+from mo_logs.strings import unicode2utf8
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestColumnar(FuzzyTestCase):
+    def test_round_trip(self):
+        table = Data(
+            meta={"format": "columnar"},
+            header=["build.platform", "result.duration", "run.tags"],
+            data=[
+                ["linux64", "win64", None, "linux64", "mac"],
+                [1, 2.5, None, 3, 2 ** 60],
+                [["a", "b"], None, {"x": 1}, "c", True]
+            ]
+        )
+        result = columnar.decode(columnar.encode(table, chunk_size=2))
+        self.assertEqual(result.meta.format, "columnar")
+        self.assertEqual(result.header, table.header)
+        self.assertEqual(result.data, table.data)
+
+    def test_chunks_and_encodings(self):
+        platforms = ["linux64", "win64", "mac"] * 1000
+        durations = [i / 4 for i in range(3000)]
+        table = Data(meta={}, header=["platform", "duration"], data=[platforms, durations])
+
+        data = columnar.encode(table, chunk_size=1000)
+        raw = zlib.decompress(data, zlib.MAX_WBITS + 16)
+        self.assertTrue(raw.startswith(MAGIC))
+        self.assertEqual(columnar.decode(data).data, [platforms, durations])
+
+        as_json = unicode2utf8(value2json([{"platform": p, "duration": d} for p, d in zip(platforms, durations)]))
+        self.assertLess(len(data), len(zlib.compress(as_json)))
+
+    def test_block_kind(self):
+        self.assertEqual(_block_kind([1, None, 2.5], None), NUMBERS)
+        self.assertEqual(_block_kind([1, 2 ** 60], None), JSON)
+        self.assertEqual(_block_kind([True, False], None), JSON)
+        self.assertEqual(_block_kind(["a", "b", "a", None], None), DICTIONARY)
+        self.assertEqual(_block_kind(["x" + str(i) for i in range(5000)], None), JSON)
+        self.assertEqual(_block_kind(["x" + str(i) for i in range(5000)], 10), DICTIONARY)
@@ -0,0 +1,49 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import gzip
+from io import BytesIO
+import zlib
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from pyLibrary.env.big_data import ibytes2icompressed, ibytes2ideflated
+
+CHUNKS = [("{\"value\": %d, \"name\": \"test_%d.html\"}, " % (i, i % 50)).encode("utf8") for i in range(10000)]
+
+
+class TestCompression(FuzzyTestCase):
+    def test_gzip_levels(self):
+        expected = b"".join(CHUNKS)
+        sizes = []
+        for level in [1, 6, 9]:
+            compressed = b"".join(ibytes2icompressed(iter(CHUNKS), level))
+            self.assertEqual(gzip.GzipFile(fileobj=BytesIO(compressed)).read(), expected)
+            sizes.append(len(compressed))
+        self.assertGreaterEqual(sizes[0], sizes[2])
+
+    def test_deflate(self):
+        compressed = b"".join(ibytes2ideflated(iter(CHUNKS), 6))
+        self.assertEqual(zlib.decompress(compressed), b"".join(CHUNKS))
+
+    def test_incremental(self):
+        # THE FIRST COMPRESSED BYTES ARE AVAILABLE BEFORE THE SOURCE IS DONE
+        consumed = []
+
+        def source():
+            for c in CHUNKS:
+                consumed.append(c)
+                yield c
+
+        compressed = ibytes2icompressed(source(), 6)
+        next(compressed)  # HEADER
+        next(compressed)
+        self.assertLess(len(consumed), len(CHUNKS))
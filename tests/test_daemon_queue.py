@@ -0,0 +1,69 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_hg.daemon_queue import DaemonQueue
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Thread, Till
+
+CENTRAL = "mozilla-central"
+AUTOLAND = "autoland"
+
+
+class TestDaemonQueue(FuzzyTestCase):
+    def test_newest_push_first(self):
+        todo = DaemonQueue("test")
+        todo.add(CENTRAL, ["aaaaaaaaaaaa1111"], push_date=1000)
+        todo.add(CENTRAL, ["bbbbbbbbbbbb2222"], push_date=3000)
+        todo.add(CENTRAL, ["cccccccccccc3333"])
+        todo.add(CENTRAL, ["dddddddddddd4444"], push_date=2000)
+
+        popped = [todo.pop()[1] for _ in range(4)]
+        self.assertEqual(popped, ["bbbbbbbbbbbb2222", "dddddddddddd4444", "aaaaaaaaaaaa1111", "cccccccccccc3333"])
+
+    def test_duplicates_across_branches(self):
+        todo = DaemonQueue("test")
+        todo.add(CENTRAL, ["aaaaaaaaaaaa1111", "bbbbbbbbbbbb2222"])
+        todo.add(AUTOLAND, ["aaaaaaaaaaaa"])  # SAME CHANGESET, SHORT ID
+        self.assertEqual(len(todo), 2)
+
+        branch, revision = todo.pop()
+        self.assertEqual((branch, revision), (CENTRAL, "aaaaaaaaaaaa1111"))
+        todo.add(AUTOLAND, ["aaaaaaaaaaaa1111"])  # IN FLIGHT
+        todo.done(revision)
+        todo.add(AUTOLAND, ["aaaaaaaaaaaa1111"])  # DONE
+        self.assertEqual(len(todo), 1)
+        self.assertEqual(todo.stats(), {"added": 2, "duplicates": 3, "done": 1, "queued": 1, "in_flight": 0})
+
+    def test_full_queue_drops_oldest(self):
+        todo = DaemonQueue("test", max_queued=4)
+        for i in range(5):
+            todo.add(CENTRAL, ["%012d" % i], push_date=1000 + i)
+        self.assertEqual(len(todo), 2)
+        self.assertEqual(todo.stats().dropped, 3)
+        self.assertEqual(todo.pop()[1], "%012d" % 4)
+        # DROPPED REVISIONS CAN BE ADDED AGAIN
+        todo.add(CENTRAL, ["%012d" % 0])
+        self.assertEqual(len(todo), 2)
+
+    def test_pop_waits(self):
+        todo = DaemonQueue("test")
+        self.assertEqual(todo.pop(till=Till(seconds=0.1)), None)
+
+        found = []
+        def worker(please_stop):
+            found.append(todo.pop(till=please_stop))
+
+        thread = Thread.run("worker", worker)
+        Till(seconds=0.1).wait()
+        todo.add(CENTRAL, ["aaaaaaaaaaaa"])
+        thread.join()
+        self.assertEqual(found, [(CENTRAL, "aaaaaaaaaaaa")])
@@ -0,0 +1,110 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_hg.parse import diff_to_json, diff_to_moves, idiff_to_json, idiff_to_moves
+from mo_json import value2json
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from pyLibrary.env.big_data import ibytes2ilines
+
+DIFF = "\n".join([
+    "# HG changeset patch",
+    "# User Someone <someone@example.com>",
+    "Bug 1234567 - example change",
+    "",
+    "diff --git a/dom/base/Element.cpp b/dom/base/Element.cpp",
+    "--- a/dom/base/Element.cpp",
+    "+++ b/dom/base/Element.cpp",
+    "@@ -10,4 +10,5 @@ namespace dom {",
+    " line10",
+    "-line11",
+    "--- line12 looks like a file header",
+    "+line11 changed",
+    "+line11b",
+    "+line11c",
+    " line13",
+    " line14",
+    "@@ -40,3 +41,2 @@ void Element::Foo()",
+    " line40",
+    "-line41",
+    " line42",
+    "diff --git a/new/file.txt b/new/file.txt",
+    "new file mode 100644",
+    "--- /dev/null",
+    "+++ b/new/file.txt",
+    "@@ -0,0 +1,2 @@",
+    "+one",
+    "+two",
+    "\\ No newline at end of file",
+    "diff --git a/image.png b/image.png",
+    "GIT binary patch",
+    "literal 30804",
+    "zcmV(?K;FNJP)<h;3K|Lk000e1NJLTq00F}Q00F}b1^@s6OMr-800001b5ch_0Itp)",
+    ""
+])
+
+
+class TestDiffParse(FuzzyTestCase):
+    def test_diff_to_json(self):
+        result = diff_to_json(DIFF)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0].new.name, "/dom/base/Element.cpp")
+        self.assertEqual(
+            result[0].changes,
+            [
+                {"old": {"line": 10, "content": "line11"}},
+                {"old": {"line": 11, "content": "-- line12 looks like a file header"}},
+                {"new": {"line": 10, "content": "line11 changed"}},
+                {"new": {"line": 11, "content": "line11b"}},
+                {"new": {"line": 12, "content": "line11c"}},
+                {"old": {"line": 40, "content": "line41"}}
+            ]
+        )
+        self.assertEqual(result[1].old.name, "dev/null")
+        self.assertEqual(result[1].new.name, "/new/file.txt")
+        self.assertEqual(
+            result[1].changes,
+            [{"new": {"line": 0, "content": "one"}}, {"new": {"line": 1, "content": "two"}}]
+        )
+
+    def test_diff_to_moves(self):
+        result = diff_to_moves(DIFF)
+        self.assertEqual(
+            value2json(result[0].changes),
+            value2json([
+                {"line": 10, "action": "-"},
+                {"line": 10, "action": "-"},
+                {"line": 10, "action": "+"},
+                {"line": 11, "action": "+"},
+                {"line": 12, "action": "+"},
+                {"line": 41, "action": "-"}
+            ])
+        )
+        self.assertEqual(len(result[1].changes), 3)
+        self.assertEqual(result[1].changes[2].action, "\\")
+        self.assertEqual([a.line for a in result[1].changes], [0, 1, 2])
+
+    def test_stream_from_bytes(self):
+        data = DIFF.encode("utf8")
+        blocks = iter([data[i:i + 7] for i in range(0, len(data), 7)])
+        streamed = list(idiff_to_moves(ibytes2ilines(blocks, encoding="latin1")))
+        self.assertEqual(value2json(streamed), value2json(diff_to_moves(DIFF)))
+
+    def test_max_changes(self):
+        result = list(idiff_to_json(DIFF.split("\n"), max_changes=3))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]["changes"], None)
+        self.assertEqual(result[1]["changes"], None)
+        self.assertEqual(result[1]["new"]["name"], "/new/file.txt")
+
+        result = list(idiff_to_json(DIFF.split("\n"), max_changes=6))
+        self.assertEqual(len(result[0]["changes"]), 6)
+        self.assertEqual(result[1]["changes"], None)
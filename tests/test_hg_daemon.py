@@ -0,0 +1,92 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_dots import Data
+from mo_hg.daemon_queue import DaemonQueue
+from mo_hg.hg_mozilla_org import HgMozillaOrg
+from mo_hg.rate_logger import RateLimiter
+from mo_hg.revision_cache import RevisionCache
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Lock, Signal, Thread, Till
+from mo_times.dates import Date
+
+RATE = 10  # hg REQUESTS PER SECOND
+CENTRAL = Data(name="mozilla-central", locale="en-US")
+
+
+class FakeHg(HgMozillaOrg):
+    """
+    NO ES, AND AN hg THAT ONLY WAITS ON THE RATE LIMITER
+    """
+
+    def __init__(self, missing=()):
+        self.revision_cache = RevisionCache()
+        self.todo = DaemonQueue("test daemon")
+        self.hg_limiter = RateLimiter("test hg", RATE)
+        self.last_cache_miss = Date.now()
+        self.missing = set(missing)
+        self.locker = Lock()
+        self.requests = []
+        self.searched = []
+
+    def _get_from_elasticsearch(self, revision, locale=None, get_diff=False, get_moves=True):
+        return None
+
+    def _get_from_hg(self, revision, locale, get_diff, get_moves, save=True):
+        self.hg_limiter.wait()
+        with self.locker:
+            self.requests.append(revision.changeset.id)
+        if revision.changeset.id in self.missing:
+            raise Exception("not found")
+        return Data(branch=revision.branch, changeset={"id": revision.changeset.id})
+
+    def _find_revision(self, revision):
+        with self.locker:
+            self.searched.append(revision)
+        raise Exception("hg is down")
+
+    def run_daemon(self, threads, expected):
+        please_stop = Signal()
+        workers = [Thread.run("test daemon " + str(i), self._daemon, please_stop=please_stop) for i in range(threads)]
+        timeout = Till(seconds=30)
+        while self.todo.stats().done < expected and not timeout:
+            Till(seconds=0.05).wait()
+        please_stop.go()
+        for w in workers:
+            w.join()
+
+
+class TestHgDaemon(FuzzyTestCase):
+    def test_limited_by_rate(self):
+        hg = FakeHg()
+        num = 3 * RATE
+        hg.todo.add(CENTRAL, [("%012d" % i).ljust(40, "0") for i in range(num)])
+
+        start = Date.now()
+        hg.run_daemon(4, num)
+        duration = (Date.now() - start).seconds
+
+        self.assertEqual(hg.todo.stats(), {"done": num, "failed": 0, "in_flight": 0})
+        self.assertEqual(len(hg.requests), num)
+        # THE LIMITER ALLOWS RATE AT ONCE, THEN RATE PER SECOND
+        self.assertLess(duration, (num - RATE) / RATE + 1.5)
+
+    def test_failure_is_done(self):
+        hg = FakeHg(missing=[("%012d" % 1).ljust(40, "0")])
+        hg.todo.add(CENTRAL, [("%012d" % i).ljust(40, "0") for i in range(3)])
+        hg.run_daemon(1, 3)
+
+        self.assertEqual(hg.todo.stats(), {"done": 3, "failed": 1, "in_flight": 0, "queued": 0})
+        self.assertEqual(hg.searched, [("%012d" % 1).ljust(40, "0")])
+        # THE FAILED REVISION IS NOT STUCK IN FLIGHT
+        hg.todo.add(CENTRAL, [("%012d" % 1).ljust(40, "0")])
+        self.assertEqual(hg.todo.stats().duplicates, 1)
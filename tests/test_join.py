@@ -0,0 +1,61 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_python.containers.list_usingPythonList import ListContainer
+from jx_python.join import LEFT, hash_join, join
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+results = [
+    {"test": "a", "task": {"id": 1}},
+    {"test": "b", "task": {"id": 2}},
+    {"test": "c", "task": {"id": 1}},
+    {"test": "d", "task": {"id": 9}},
+    {"test": "e"},
+]
+tasks = [
+    {"task": {"id": 1}, "platform": "linux"},
+    {"task": {"id": 2}, "platform": "win"},
+    {"task": {"id": 3}, "platform": "mac"},
+]
+
+
+class TestJoin(FuzzyTestCase):
+    def test_inner(self):
+        result = hash_join(results, tasks, ["task.id"])
+        self.assertEqual(
+            [(r.left.test, r.right.platform) for r in result],
+            [("a", "linux"), ("b", "win"), ("c", "linux")]
+        )
+
+    def test_left_outer(self):
+        result = hash_join(results, tasks, {"task.id": "task.id"}, kind=LEFT, names=("result", "task"))
+        self.assertEqual(
+            [(r.result.test, r.task.platform) for r in result],
+            [("a", "linux"), ("b", "win"), ("c", "linux"), ("d", None), ("e", None)]
+        )
+
+    def test_spill_to_sqlite(self):
+        expected = hash_join(results, tasks, ["task.id"], kind=LEFT)
+        result = hash_join(results, tasks, ["task.id"], kind=LEFT, build_limit=1)
+        self.assertEqual(result, expected)
+
+        expected = hash_join(tasks, results, ["task.id"])
+        result = hash_join(tasks, results, ["task.id"], build_limit=1)
+        self.assertEqual(sorted(result, key=lambda r: r.right.test), sorted(expected, key=lambda r: r.right.test))
+
+    def test_semi_join(self):
+        container = ListContainer("tasks", tasks)
+        result = join(results[:2], {"from": container}, ["task.id"])
+        self.assertEqual(
+            [(r.left.test, r.right.platform) for r in result],
+            [("a", "linux"), ("b", "win")]
+        )
@@ -0,0 +1,102 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from io import BytesIO
+
+from mo_dots import Data, unwrap
+from mo_json import stream, value2json
+from mo_logs.strings import unicode2utf8
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from pyLibrary.env.elasticsearch import Index, _explain, _parse_response
+
+RESPONSE = {
+    "took": 3,
+    "_shards": {"total": 5, "failed": 0},
+    "hits": {"total": 3, "hits": [
+        {"_id": "a", "_source": {"x": 1, "y": {"z": [1, 2]}}, "fields": {"f": [1]}, "sort": [1]},
+        {"_id": "b", "_source": {"x": 2}},
+        {"_id": "c", "inner_hits": {"k": {"hits": {"hits": []}}}}
+    ]}
+}
+
+EXPECTED_VARS = {"hits.hits._id", "hits.hits._source", "hits.hits.fields", "_shards.failed"}
+
+
+class TestJsonStream(FuzzyTestCase):
+    def test_in_memory_hits(self):
+        rows = [unwrap(r) for r in stream.parse(value2json(RESPONSE), "hits.hits", EXPECTED_VARS)]
+        self.assertEqual(
+            rows,
+            [
+                {"_shards": {"failed": 0}, "hits": {"hits": {"_id": "a", "_source": {"x": 1, "y": {"z": [1, 2]}}, "fields": {"f": [1]}}}},
+                {"_shards": {"failed": 0}, "hits": {"hits": {"_id": "b", "_source": {"x": 2}}}},
+                {"_shards": {"failed": 0}, "hits": {"hits": {"_id": "c"}}}
+            ]
+        )
+
+    def test_stream_matches_in_memory(self):
+        content = unicode2utf8(value2json(RESPONSE))
+        expected = [unwrap(r) for r in stream.parse(content, "hits.hits", EXPECTED_VARS)]
+        from_stream = [unwrap(r) for r in stream.parse(BytesIO(content), "hits.hits", EXPECTED_VARS)]
+        self.assertEqual(from_stream, expected)
+
+    def test_small_reads(self):
+        # EVERY TOKEN IS SPLIT OVER READS, INCLUDING MULTI-BYTE CHARACTERS AND NUMBERS
+        response = {"hits": {"hits": [{"_id": "\u00e9t\u00e9", "_source": {"n": 123456789}}, {"_id": "b", "_source": {"n": -1.5e3}}]}}
+        content = BytesIO(unicode2utf8(value2json(response)))
+        rows = [unwrap(r) for r in stream.parse(lambda: content.read(1), "hits.hits", EXPECTED_VARS)]
+        self.assertEqual(
+            rows,
+            [
+                {"hits": {"hits": {"_id": "\u00e9t\u00e9", "_source": {"n": 123456789}}}},
+                {"hits": {"hits": {"_id": "b", "_source": {"n": -1500}}}}
+            ]
+        )
+
+    def test_empty_hits(self):
+        rows = list(stream.parse('{"hits": {"total": 0, "hits": []}}', "hits.hits", EXPECTED_VARS))
+        self.assertEqual(rows, [])
+
+    def test_items(self):
+        rows = [unwrap(r) for r in stream.parse(value2json(RESPONSE), {"items": "_shards"}, {"_shards.name", "_shards.value"})]
+        self.assertEqual(
+            sorted(rows, key=lambda r: r["_shards"]["name"]),
+            [
+                {"_shards": {"name": "failed", "value": 0}},
+                {"_shards": {"name": "total", "value": 5}}
+            ]
+        )
+
+    def test_search_errors_while_streaming(self):
+        # THE SHARD FAILURE IS FOUND AFTER search() RETURNS, WHILE THE CALLER ITERATES
+        failed = dict(RESPONSE, _shards={"total": 5, "failed": 1, "failures": [{"reason": "broken shard"}]})
+        index = Index.__new__(Index)
+        index.debug = False
+        index.path = "/test"
+        index.settings = Data()
+        index.cluster = Data(post=lambda path, query_path, expected_vars, **kwargs: _explain(
+            _parse_response(FakeResponse(failed), query_path, expected_vars),
+            "Problem with call to {{url}}",
+            url=path
+        ))
+
+        rows = index.search({"query": {"match_all": {}}}, query_path="hits.hits", expected_vars=EXPECTED_VARS)
+        self.assertRaises("Problem with search", list, rows)
+
+
+class FakeResponse(object):
+    def __init__(self, response):
+        self._content = self.content = unicode2utf8(value2json(response))
+        self.closed = False
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,95 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_base.query import QueryOp
+from jx_python.containers.list_usingPythonList import ListContainer
+from jx_python.expressions import jx_expression_to_function
+from mo_dots import path_getter, path_setter, split_field, wrap
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times.timer import Timer
+
+
+class TestPaths(FuzzyTestCase):
+    def test_split_field_is_a_copy(self):
+        path = split_field("a.b")
+        path.append("c")
+        self.assertEqual(split_field("a.b"), ["a", "b"])
+
+    def test_split_escaped(self):
+        self.assertEqual(split_field("a\\.b.c"), ["a.b", "c"])
+        self.assertEqual(split_field("..a.b"), [-1, "a", "b"])
+        self.assertEqual(split_field("."), [])
+
+    def test_getter(self):
+        data = {"a": {"b": [{"c": 1}, {"c": 2}]}, "x": 3}
+        self.assertEqual(path_getter("a.b.c")(data), [1, 2])
+        self.assertEqual(path_getter("a.b.c")(wrap(data)), wrap(data)["a.b.c"])
+        self.assertEqual(path_getter("x")(data), 3)
+        self.assertEqual(path_getter("y.z")(data), None)
+
+    def test_setter(self):
+        data = {"x": 3}
+        setter = path_setter("p.q")
+        setter(data, 4)
+        self.assertEqual(data, {"x": 3, "p": {"q": 4}})
+        setter(wrap(data), None)
+        self.assertEqual(data, {"x": 3, "p": {}})
+
+    def test_translation_speed(self):
+        # NOT A PASS/FAIL TEST; SHOWS TIMING OF A REPRESENTATIVE QUERY TRANSLATION
+        data = [
+            {
+                "build": {"platform": "linux", "type": "opt"},
+                "run": {"suite": {"name": "mochitest"}, "chunk": i % 5},
+                "result": {"test": "t" + str(i), "ok": True, "duration": i / 10},
+            }
+            for i in range(100)
+        ]
+        container = ListContainer("unittest", data)
+        query = {
+            "from": "unittest",
+            "select": ["build.platform", "run.suite.name", {"name": "dur", "value": "result.duration"}],
+            "where": {"and": [
+                {"eq": {"build.type": "opt"}},
+                {"gt": {"result.duration": 1}},
+                {"prefix": {"result.test": "t1"}}
+            ]},
+            "sort": ["run.chunk", "result.test"]
+        }
+
+        with Timer("translate", silent=True) as translate:
+            for _ in range(100):
+                op = QueryOp.wrap(query, container, container.namespace)
+                jx_expression_to_function(op.where)
+                for s in op.select:
+                    jx_expression_to_function(s.value)
+
+        rows = [wrap(d) for d in data]
+        with Timer("Data[path]", silent=True) as by_item:
+            for _ in range(100):
+                for r in rows:
+                    r["build.platform"], r["run.suite.name"], r["result.duration"]
+
+        getters = [path_getter(p) for p in ["build.platform", "run.suite.name", "result.duration"]]
+        with Timer("path_getter", silent=True) as by_getter:
+            for _ in range(100):
+                for r in rows:
+                    for g in getters:
+                        g(r)
+
+        Log.note(
+            "translate: {{translate}}, Data[path]: {{by_item}}, path_getter: {{by_getter}}",
+            translate=translate.duration,
+            by_item=by_item.duration,
+            by_getter=by_getter.duration
+        )
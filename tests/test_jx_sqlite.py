@@ -0,0 +1,298 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from copy import deepcopy
+import os
+import shutil
+import tempfile
+
+from jx_sqlite import Container
+from jx_sqlite.index_advisor import INDEX_THRESHOLD
+from mo_dots import wrap
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from pyLibrary.sql.sqlite import Sqlite, quote_column
+
+
+class TestJxSqlite(FuzzyTestCase):
+    def setUp(self):
+        self.container = Container("test", db=Sqlite())
+        self.container.insert([{"a": "x", "v": 1}, {"a": "y", "v": 2}, {"a": "x", "v": 3}])
+
+    def tearDown(self):
+        self.container.db.close()
+
+    def test_where(self):
+        result = self.container.query({"from": "test", "select": ["a", "v"], "where": {"gt": {"v": 1}}, "sort": "v", "format": "list"})
+        self.assertEqual(result.data, [{"a": "y", "v": 2}, {"a": "x", "v": 3}])
+
+    def test_missing_column(self):
+        result = self.container.query({"from": "test", "select": ["a", "missing"], "sort": "v", "format": "list"})
+        self.assertEqual(result.data, [{"a": "x", "missing": None}, {"a": "y", "missing": None}, {"a": "x", "missing": None}])
+
+    def test_binary_ops(self):
+        result = self.container.query({"from": "test", "select": [{"name": "d", "value": {"sub": ["v", 1]}}, {"name": "m", "value": {"mod": ["v", 2]}}], "sort": "v", "format": "list"})
+        self.assertEqual(result.data, [{"d": 0, "m": 1}, {"d": 1, "m": 0}, {"d": 2, "m": 1}])
+
+    def test_exp_not_supported(self):
+        self.assertRaises("not supported", self.container.query, {"from": "test", "select": {"name": "e", "value": {"exp": ["v", 2]}}})
+
+    def test_sort(self):
+        result = self.container.query({"from": "test", "select": "v", "sort": {"v": "desc"}, "format": "list"})
+        self.assertEqual(result.data, [3, 2, 1])
+
+    def test_edges(self):
+        result = self.container.query({"from": "test", "edges": "a", "select": {"value": "v", "aggregate": "sum"}, "format": "cube"})
+        self.assertEqual(result.data.v, [4, 2, None])
+
+    def test_count(self):
+        result = self.container.query({"from": "test", "select": {"aggregate": "count"}, "format": "value"})
+        self.assertEqual(result.data, 3)
+
+    def test_groupby_median(self):
+        result = self.container.query({"from": "test", "groupby": "a", "select": {"name": "m", "value": "v", "aggregate": "median"}, "format": "table"})
+        self.assertEqual(result.data, [["x", 2], ["y", 2]])
+
+    def test_delete(self):
+        self.container.delete({"eq": {"a": "x"}})
+        result = self.container.query({"from": "test", "select": "a", "format": "list"})
+        self.assertEqual(result.data, ["y"])
+
+    def test_metadata(self):
+        result = self.container.query_metadata({"from": "meta.columns", "where": {"eq": {"table": "test"}}, "format": "list"})
+        self.assertEqual(
+            {(r.name, r.type) for r in result.data},
+            {("a", "string"), ("v", "number"), ("_id", "string")}
+        )
+
+    def test_window_sum(self):
+        result = self.container.query({
+            "from": "test",
+            "select": ["a", "v"],
+            "window": {"name": "total", "value": "v", "aggregate": "sum", "edges": "a"},
+            "sort": "v",
+            "format": "list"
+        })
+        self.assertEqual(result.data, [
+            {"a": "x", "v": 1, "total": 4},
+            {"a": "y", "v": 2, "total": 2},
+            {"a": "x", "v": 3, "total": 4}
+        ])
+
+    def test_window_running_sum(self):
+        result = self.container.query({
+            "from": "test",
+            "select": "v",
+            "window": {"name": "running", "value": "v", "aggregate": "sum", "sort": "v", "range": {"max": 0}},
+            "sort": "v",
+            "format": "list"
+        })
+        self.assertEqual(result.data, [{"v": 1, "running": 1}, {"v": 2, "running": 3}, {"v": 3, "running": 6}])
+
+    def test_window_rownum(self):
+        result = self.container.query({
+            "from": "test",
+            "select": ["a", "v"],
+            "window": {"name": "r", "value": "rownum", "edges": "a", "sort": {"v": "desc"}},
+            "sort": "v",
+            "format": "list"
+        })
+        self.assertEqual(result.data, [
+            {"a": "x", "v": 1, "r": 1},
+            {"a": "y", "v": 2, "r": 0},
+            {"a": "x", "v": 3, "r": 0}
+        ])
+
+    def test_window_with_groupby(self):
+        self.assertRaises("only supported on set operations", self.container.query, {
+            "from": "test",
+            "groupby": "a",
+            "select": {"value": "v", "aggregate": "sum"},
+            "window": {"name": "r", "value": "rownum"}
+        })
+
+    def test_window_on_nested(self):
+        self.container.insert([{"a": "z", "v": 4, "b": [{"c": 1}, {"c": 2}]}])
+        self.assertRaises("nested documents", self.container.query, {
+            "from": "test",
+            "select": "v",
+            "window": {"name": "r", "value": "rownum", "sort": "v"}
+        })
+
+
+class TestIndexAdvisor(FuzzyTestCase):
+    def setUp(self):
+        self.container = Container("test", db=Sqlite())
+        self.container.insert([{"a": "x", "v": 1, "b": [{"c": 1}, {"c": 2}]}, {"a": "y", "v": 2}])
+
+    def tearDown(self):
+        self.container.db.close()
+
+    def indexes(self):
+        result = self.container.db.query("SELECT name, tbl_name FROM sqlite_master WHERE type='index' AND name LIKE '__index__%'")
+        return {tuple(r) for r in result.data}
+
+    def test_hot_column_is_indexed(self):
+        for i in range(INDEX_THRESHOLD - 1):
+            self.container.query({"from": "test", "select": "a", "where": {"gt": {"v": 1}}})
+        self.assertEqual(self.indexes(), set())
+
+        self.container.query({"from": "test", "select": "a", "where": {"gt": {"v": 1}}})
+        self.assertEqual(self.indexes(), {("__index__test.v.$number", "test")})
+
+        plan = self.container.db.query("EXPLAIN QUERY PLAN SELECT __id__ FROM test WHERE \"v.$number\" > 1")
+        self.assertIn("__index__test.v.$number", " ".join(r[-1] for r in plan.data))
+
+    def test_index_in_metadata(self):
+        for i in range(INDEX_THRESHOLD):
+            self.container.query({"from": "test", "select": "a", "where": {"gt": {"v": 1}}})
+        result = self.container.query_metadata({"from": "meta.columns", "where": {"eq": {"name": "v"}}, "format": "list"})
+        self.assertEqual(result.data[0].index, "__index__test.v.$number")
+
+    def test_index_joins(self):
+        self.container.index_advisor.index_joins()
+        self.assertEqual(self.container.index_advisor.create_indexes(), ["__index__test.b.__parent__"])
+        self.assertEqual(self.indexes(), {("__index__test.b.__parent__", "test.b")})
+
+    def test_no_auto_index(self):
+        container = Container("other", db=self.container.db, auto_index=False)
+        container.insert([{"v": 1}])
+        for i in range(INDEX_THRESHOLD):
+            container.query({"from": "other", "select": "v", "where": {"gt": {"v": 0}}})
+        self.assertEqual(container.index_advisor.advise(), [("other", "v.$number")])
+        self.assertEqual(self.indexes(), set())
+
+
+class TestSchemaChange(FuzzyTestCase):
+    def setUp(self):
+        self.container = Container("test", db=Sqlite())
+        self.container.insert([{"a": "x", "v": 1}])
+
+    def tearDown(self):
+        self.container.db.close()
+
+    def columns(self, table):
+        result = self.container.db.query("PRAGMA table_info(" + quote_column(table) + ")")
+        return {r[1]: r[2] for r in result.data}
+
+    def test_one_change_per_batch(self):
+        changes = []
+        change_schema = self.container.sf.change_schema
+
+        def record(required_changes):
+            changes.append(required_changes)
+            change_schema(required_changes)
+
+        self.container.sf.change_schema = record
+        self.container.insert([{"a": 1}, {"w": "new"}, {"b": {"c": True}}])
+        self.container.insert([{"a": 2, "w": "again"}])
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(
+            {c.add.es_column for c in wrap(changes[0])},
+            {"a.$number", "w.$string", "b.$object", "b.c.$boolean"}
+        )
+        self.assertEqual(
+            self.columns("test"),
+            {
+                "_id": "TEXT",
+                "__id__": "INTEGER",
+                "a.$string": "TEXT",
+                "v.$number": "REAL",
+                "a.$number": "REAL",
+                "w.$string": "TEXT",
+                "b.$object": "TEXT",
+                "b.c.$boolean": "TINYINT"
+            }
+        )
+        result = self.container.query({"from": "test", "select": ["a", "w"], "format": "list"})
+        self.assertEqual(result.data, [
+            {"a": "x"},
+            {"a": 1},
+            {"w": "new"},
+            {},
+            {"a": 2, "w": "again"}
+        ])
+
+    def test_column_types(self):
+        self.container.insert([{"a": 1, "b": {"c": True}}])
+        types = {(c.name, c.jx_type) for c in self.container.sf.columns}
+        self.assertEqual(types, {
+            ("a", "string"),
+            ("a", "number"),
+            ("v", "number"),
+            ("b", "object"),
+            ("b.c", "boolean")
+        })
+
+    def test_nested_array(self):
+        self.container.insert([{"a": "y", "d": [{"e": 1}, {"e": 2}]}])
+        self.assertIn("d", self.container.sf.tables)
+        self.assertEqual(
+            self.columns("test.d"),
+            {"__id__": "INTEGER", "__parent__": "INTEGER", "__order__": "INTEGER", "d.e.$number": "REAL"}
+        )
+        parent = self.container.db.query("SELECT __id__ FROM test WHERE \"a.$string\"='y'").data[0][0]
+        result = self.container.db.query("SELECT __parent__, __order__, \"d.e.$number\" FROM \"test.d\" ORDER BY __order__")
+        self.assertEqual([tuple(r) for r in result.data], [(parent, 0, 1), (parent, 1, 2)])
+
+    def test_object_becomes_nested(self):
+        self.container.insert([{"b": {"c": True}}])
+        self.container.insert([{"b": [{"c": False}, {"c": True}]}])
+        self.assertNotIn("b.c.$boolean", self.columns("test"))
+        self.assertIn("b.c.$boolean", self.columns("test.b"))
+        column = [c for c in self.container.sf.columns if c.es_column == "b.c.$boolean"][0]
+        self.assertEqual(column.nested_path, ["b", "."])
+        result = self.container.db.query("SELECT \"b.c.$boolean\" FROM \"test.b\" ORDER BY __order__")
+        self.assertEqual([r[0] for r in result.data], [0, 1])
+
+
+class TestSnapshot(FuzzyTestCase):
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp, "snapshot.sqlite")
+        self.container = Container("test", db=Sqlite())
+        self.container.insert([{"a": "x", "v": 1, "b": [{"c": 1}, {"c": 2}]}, {"a": "y", "v": 2}, {"a": "x", "v": 3}])
+        for i in range(INDEX_THRESHOLD):
+            self.container.query({"from": "test", "select": "a", "where": {"gt": {"v": 1}}})
+        self.container.export(self.filename)
+        self.snapshot = Container.from_snapshot("test", self.filename, readers=2)
+
+    def tearDown(self):
+        self.snapshot.db.close()
+        self.container.db.close()
+        shutil.rmtree(self.temp, ignore_errors=True)
+
+    def test_same_results(self):
+        queries = [
+            {"from": "test", "select": ["a", "v"], "where": {"gt": {"v": 1}}, "sort": "v", "format": "list"},
+            {"from": "test", "groupby": "a", "select": {"value": "v", "aggregate": "sum"}, "format": "table"},
+            {"from": "test.b", "select": "c", "format": "list"}
+        ]
+        for q in queries:
+            self.assertEqual(self.snapshot.query(deepcopy(q)).data, self.container.query(deepcopy(q)).data)
+
+    def test_indexes_exported(self):
+        indexes = self.snapshot.db.query("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE '__index__%'")
+        self.assertEqual(
+            {r[0] for r in indexes.data},
+            {"__index__test.b.__parent__", "__index__test.v.$number"}
+        )
+
+    def test_indexes_in_metadata(self):
+        self.assertEqual(self.snapshot.index_advisor.advise(), [])
+        result = self.snapshot.query_metadata({"from": "meta.columns", "where": {"eq": {"name": "v"}}, "format": "list"})
+        self.assertEqual(result.data[0].index, "__index__test.v.$number")
+
+    def test_read_only(self):
+        self.assertRaises("readonly", self.snapshot.insert, [{"a": "z"}])
+        self.assertFalse(os.path.exists(self.filename + "-wal"))
+        self.assertFalse(os.path.exists(self.filename + "-shm"))
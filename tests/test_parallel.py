@@ -0,0 +1,90 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from copy import deepcopy
+
+from jx_python import jx, parallel
+from jx_python.containers.list_usingPythonList import ListContainer
+from jx_python.windows import name2accumulator
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+# EVERY ACCUMULATOR WITH A merge(), AND THE EXTRA PARAMETERS IT NEEDS
+AGGREGATES = {
+    "count": {},
+    "sum": {},
+    "exists": {},
+    "max": {},
+    "maximum": {},
+    "list": {},
+    "min": {},
+    "minimum": {},
+    "percentile": {"percentile": 0.5},
+    "one": {}
+}
+
+
+def sample_data():
+    # "k" IS ONLY IN THE FIRST RECORD, SO MOST PARTITIONS SEE NO VALUE FOR aggregate:"one"
+    data = [{"g": "abc"[i % 3], "v": i, "k": None} for i in range(300)]
+    data[0]["k"] = "only"
+    data[1]["v"] = None
+    return data
+
+
+class TestParallel(FuzzyTestCase):
+    def setUp(self):
+        self.threshold = parallel.PARALLEL_THRESHOLD
+        self.processes = parallel.MAX_PROCESSES
+        parallel.PARALLEL_THRESHOLD = 10
+        parallel.MAX_PROCESSES = 4
+
+    def tearDown(self):
+        parallel.PARALLEL_THRESHOLD = self.threshold
+        parallel.MAX_PROCESSES = self.processes
+
+    def run_both(self, query):
+        data = sample_data()
+        self.assertTrue(parallel.is_parallel(data))
+        parallel_result = jx.run(dict(deepcopy(query), **{"from": "test"}), container=ListContainer("test", data))
+
+        parallel.PARALLEL_THRESHOLD = 0
+        serial_result = jx.run(dict(deepcopy(query), **{"from": "test"}), container=ListContainer("test", sample_data()))
+        return parallel_result, serial_result
+
+    def test_all_aggregates_merge(self):
+        self.assertEqual(set(AGGREGATES.keys()), set(name2accumulator.keys()))
+
+        for aggregate, params in AGGREGATES.items():
+            value = "k" if aggregate == "one" else "v"
+            select = dict(name="result", value=value, aggregate=aggregate, **params)
+            parallel_result, serial_result = self.run_both({"select": select, "edges": "g"})
+            self.assertEqual(
+                parallel_result.data["result"].cube,
+                serial_result.data["result"].cube,
+                "aggregate " + aggregate + " differs when run in parallel"
+            )
+            parallel.PARALLEL_THRESHOLD = 10
+
+    def test_one_conflict(self):
+        data = sample_data()
+        data[299]["k"] = "other"
+        self.assertRaises(
+            "Expecting value to match",
+            jx.run,
+            {"from": "test", "select": {"value": "k", "aggregate": "one"}},
+            ListContainer("test", data)
+        )
+
+    def test_filter(self):
+        parallel_result, serial_result = self.run_both({"select": "v", "where": {"eq": {"g": "b"}}, "format": "list"})
+        self.assertEqual(parallel_result.data, serial_result.data)
+        self.assertEqual(len(parallel_result.data), 100)
@@ -0,0 +1,34 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_hg.rate_logger import RateLimiter
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Signal
+from mo_times import SECOND
+from mo_times.timer import Timer
+
+
+class TestRateLimiter(FuzzyTestCase):
+    def test_limit(self):
+        limiter = RateLimiter("test", rate=2, amortization_period=0.5 * SECOND)
+        with Timer("limited", silent=True) as timer:
+            for _ in range(3):
+                self.assertTrue(limiter.wait())
+        # ONLY ONE REQUEST PER HALF SECOND
+        self.assertGreater(timer.duration.seconds, 0.9)
+
+    def test_stop(self):
+        limiter = RateLimiter("test", rate=1, amortization_period=60 * SECOND)
+        self.assertTrue(limiter.wait())
+        please_stop = Signal()
+        please_stop.go()
+        self.assertFalse(limiter.wait(till=please_stop))
@@ -0,0 +1,70 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from active_data.actions import find_container
+from active_data.replica import Replica, _page, replicas
+from jx_python import jx
+from jx_python.containers.list_usingPythonList import ListContainer
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestReplica(FuzzyTestCase):
+    def test_last_page(self):
+        docs = [{"etl": {"timestamp": t}} for t in [1, 2, 2]]
+        result, last, more = _page(docs, "etl.timestamp", 5)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(last, 2)
+        self.assertFalse(more)
+
+    def test_full_page_leaves_last_timestamp(self):
+        docs = [{"etl": {"timestamp": t}} for t in [1, 2, 3, 3]]
+        result, last, more = _page(docs, "etl.timestamp", 4)
+        self.assertEqual(result, [{"etl": {"timestamp": 1}}, {"etl": {"timestamp": 2}}])
+        self.assertEqual(last, 2)
+        self.assertTrue(more)
+
+    def test_empty_page(self):
+        result, last, more = _page([], "etl.timestamp", 4)
+        self.assertEqual(result, [])
+        self.assertEqual(last, None)
+        self.assertFalse(more)
+
+
+class TestReplicaContainer(FuzzyTestCase):
+    def setUp(self):
+        self.source = ListContainer("test_replica", [{"a": i, "etl": {"timestamp": i}} for i in range(10)])
+        self.replica = Replica(name="test_replica", source=self.source, where={"gte": {"a": 3}}, interval="hour")
+        # REFRESH BY HAND, SO THE TESTS ARE NOT RACING THE WORKER
+        self.replica.worker.stop()
+        self.replica.worker.join()
+        self.replica.refresh()
+
+    def tearDown(self):
+        self.replica.container.db.close()
+        replicas.pop("test_replica", None)
+
+    def test_find_container(self):
+        self.assertIs(find_container("test_replica", after=None), self.replica)
+
+    def test_query_through_actions(self):
+        frum = find_container("test_replica", after=None)
+        result = jx.run({"from": "test_replica", "select": "a", "sort": "a", "format": "list"}, container=frum)
+        self.assertEqual(result.data, [3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(result.meta.replica.name, "test_replica")
+        self.assertEqual(result.meta.replica.timestamp, 9)
+        self.assertGreaterEqual(result.meta.replica.staleness, 0)
+
+    def test_refresh_adds_new_records(self):
+        self.source.data.append({"a": 10, "etl": {"timestamp": 10}})
+        self.assertEqual(self.replica.refresh(), 1)
+        result = jx.run({"from": "test_replica", "select": "a", "where": {"gt": {"a": 8}}, "sort": "a", "format": "list"}, container=self.replica)
+        self.assertEqual(result.data, [9, 10])
@@ -0,0 +1,90 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_files import TempFile
+from mo_hg import revision_cache
+from mo_hg.revision_cache import RevisionCache
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+REVISION = {
+    "branch": {"name": "mozilla-central", "locale": "en-US"},
+    "changeset": {
+        "id": "0123456789abcdef",
+        "id12": "0123456789ab",
+        "diff": [{"new": {"name": "a.txt"}}],
+        "moves": [{"new": {"name": "a.txt"}, "old": {"name": "b.txt"}}]
+    },
+    "push": {"id": 42}
+}
+KEY = ("mozilla-central", "en-US", "0123456789ab")
+
+
+class TestRevisionCache(FuzzyTestCase):
+    def test_diff_kept_apart(self):
+        cache = RevisionCache()
+        cache.add(*KEY, revision=REVISION, has_diff=False, has_moves=True)
+
+        found = cache.get(*KEY)
+        self.assertEqual(found.push.id, 42)
+        self.assertEqual(found.changeset.diff, None)
+        self.assertEqual(found.changeset.moves, None)
+        self.assertEqual(cache.get(*KEY, get_moves=True).changeset.moves, REVISION["changeset"]["moves"])
+        # THE diff WAS NOT FOUND, SO THE CALLER MUST LOOK ELSEWHERE
+        self.assertEqual(cache.get(*KEY, get_diff=True), None)
+
+        cache.add(*KEY, revision=REVISION, has_diff=True, has_moves=False)
+        found = cache.get(*KEY, get_diff=True, get_moves=True)
+        self.assertEqual(found.changeset.diff, REVISION["changeset"]["diff"])
+        self.assertEqual(found.changeset.moves, REVISION["changeset"]["moves"])
+
+    def test_memory_is_bounded(self):
+        cache = RevisionCache(max_memory=2)
+        for i in range(3):
+            cache.add("try", "en-US", str(i), revision={"changeset": {"id12": str(i)}})
+        self.assertEqual(cache.get("try", "en-US", "0"), None)
+        self.assertEqual(cache.get("try", "en-US", "2").changeset.id12, "2")
+
+    def test_stored(self):
+        with TempFile() as temp:
+            cache = RevisionCache(filename=temp.abspath)
+            cache.add(*KEY, revision=REVISION, has_diff=True, has_moves=True)
+            cache.close()
+
+            cache = RevisionCache(filename=temp.abspath)
+            try:
+                self.assertEqual(cache.get(*KEY).changeset.id, "0123456789abcdef")
+                found = cache.get(*KEY, get_diff=True, get_moves=True)
+                self.assertEqual(found.changeset.diff, REVISION["changeset"]["diff"])
+                self.assertEqual(found.changeset.moves, REVISION["changeset"]["moves"])
+            finally:
+                cache.close()
+
+    def test_last_used_not_written_on_every_read(self):
+        with TempFile() as temp:
+            cache = RevisionCache(filename=temp.abspath)
+            cache.add(*KEY, revision=REVISION)
+            with cache.db.transaction() as t:
+                t.execute("UPDATE revision SET last_used=1")
+            cache.close()
+
+            def read():
+                cache = RevisionCache(filename=temp.abspath)
+                try:
+                    self.assertEqual(cache.get(*KEY).push.id, 42)
+                    return cache.db.query("SELECT last_used FROM revision").data[0][0]
+                finally:
+                    cache.close()
+
+            # AN OLD last_used IS UPDATED, A RECENT ONE IS LEFT ALONE
+            touched = read()
+            self.assertGreater(touched, revision_cache.TOUCH_INTERVAL)
+            self.assertEqual(read(), touched)
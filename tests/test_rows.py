@@ -0,0 +1,86 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_python import jx
+from jx_python.containers.list_usingPythonList import ListContainer
+from mo_dots import Data, is_data, literal_field
+from mo_dots import rows
+from mo_dots.rows import row_type
+from mo_json import value2json
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestRows(FuzzyTestCase):
+    def test_columns(self):
+        Row = row_type(["a", "b.c"])
+        r = Row(1, "x")
+        self.assertTrue(is_data(r))
+        self.assertEqual(r.a, 1)
+        self.assertEqual(r["b.c"], "x")
+        self.assertEqual(r.__data__(), {"a": 1, "b": {"c": "x"}})
+
+    def test_escaped_dots(self):
+        # es52 NAMES LEAF COLUMNS WITH literal_field()
+        Row = row_type([literal_field("build.platform"), "a"])
+        r = Row("linux64", 1)
+        self.assertEqual(r[literal_field("build.platform")], "linux64")
+        self.assertEqual(r.__data__(), {"build.platform": "linux64", "a": 1})
+        expected = Data()
+        expected[literal_field("build.platform")] = "linux64"
+        expected.a = 1
+        self.assertEqual(value2json(r), value2json(expected))
+
+    def test_extra_keys(self):
+        Row = row_type(["a", "v"])
+        r = Row("x", 1)
+        r["r"] = 3
+        r["d.e"] = 4
+        self.assertEqual(r.r, 3)
+        self.assertEqual(r.__data__(), {"a": "x", "v": 1, "r": 3, "d": {"e": 4}})
+        self.assertEqual(value2json(r), value2json({"a": "x", "v": 1, "r": 3, "d": {"e": 4}}))
+
+        c = r.copy()
+        c["r"] = 5
+        self.assertEqual(r.r, 3)
+
+        r["r"] = None
+        r["d.e"] = None
+        self.assertEqual(r.__data__(), {"a": "x", "v": 1})
+
+        empty = Row()
+        self.assertFalse(empty)
+        empty["r"] = 0
+        self.assertTrue(empty)
+
+    def test_select_with_window(self):
+        container = ListContainer("test", [{"a": "x", "v": 3}, {"a": "y", "v": 1}, {"a": "x", "v": 2}])
+        result = jx.run(
+            {"from": "test", "select": ["a", "v"], "window": {"name": "r", "value": "rownum"}, "format": "list"},
+            container=container
+        )
+        self.assertEqual(result.data, [
+            {"a": "x", "v": 3, "r": 0},
+            {"a": "y", "v": 1, "r": 1},
+            {"a": "x", "v": 2, "r": 2}
+        ])
+
+    def test_bounded_types(self):
+        limit = rows.MAX_ROW_TYPES
+        try:
+            rows.MAX_ROW_TYPES = len(rows._row_types)
+            Row = row_type(["never", "seen", "before"])
+            r = Row(1, None, 3)
+            self.assertIsInstance(r, Data)
+            self.assertEqual(r, {"never": 1, "before": 3})
+            self.assertNotIn(("never", "seen", "before"), rows._row_types)
+        finally:
+            rows.MAX_ROW_TYPES = limit
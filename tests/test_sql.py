@@ -10,12 +10,15 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
-from active_data.actions.sql import parse_sql
+from active_data.actions import sql as sql_action
+from active_data.actions.sql import _parse_sql, normalize_sql, parse_sql
 from jx_base.expressions import NULL
 from mo_dots import Data, wrap
 from mo_files.url import URL
 from mo_json import json2value, utf82unicode
 from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times.timer import Timer
 from tests import compare_to_expected
 from tests.test_jx import BaseTestCase, TEST_TABLE
 
@@ -158,3 +161,64 @@ class TestSQL(BaseTestCase):
         self.assertEqual(response.status_code, 200)
         return json2value(utf82unicode(response.content))
 
+
+class TestParseSQL(FuzzyTestCase):
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize_sql("SELECT  a,\n\tb FROM t WHERE c = 'x  y' ;"),
+            "SELECT a,\nb FROM t WHERE c = 'x  y'"
+        )
+        # NEWLINES STILL END COMMENTS
+        self.assertEqual(normalize_sql("select a -- comment\n  from t"), "select a -- comment\nfrom t")
+
+    def test_cached_copies(self):
+        first = parse_sql("select a as x, count(1) from t group by a")
+        first.select = None
+        second = parse_sql("select a as x,   count(1)   from t group by a")
+        self.assertEqual(second.select, [{"value": 1, "aggregate": "count"}])
+        self.assertIn(normalize_sql("select a as x, count(1) from t group by a"), sql_action.sql_cache)
+
+    def test_parse_samples(self):
+        # THE PARSE TIMES ARE ONLY NOTED, NOT CHECKED
+        sql_action.sql_cache.clear()
+        with Timer("parse", silent=True) as parse:
+            expected = [_parse_sql(s) for s in SAMPLE_SQL]
+
+        with Timer("parse_sql", silent=True) as cached:
+            for _ in range(10):
+                for s, e in zip(SAMPLE_SQL, expected):
+                    self.assertEqual(parse_sql(s), e)
+
+        Log.note(
+            "{{num}} statements: parse {{parse}}, parse_sql (10 times each) {{cached}}",
+            num=len(SAMPLE_SQL),
+            parse=parse.duration,
+            cached=cached.duration
+        )
+
+
+SAMPLE_SQL = [
+    'select a as "a", count(1) as "count" from ' + TEST_TABLE + ' group by a',
+    'select * from ' + TEST_TABLE + ' where v>=3',
+    "SELECT 1",
+    """
+    SELECT
+        floor(run.timestamp/86400) as date,
+        count(result.value) AS "count",
+        median(result.value) AS "median",
+        percentile(result.value, 0.9) AS "90th"
+    FROM
+        perf
+    WHERE
+        run.timestamp>=date('today-month') AND
+        run.framework.name='vcs' AND
+        run.suite='clone'
+    GROUP BY
+        floor(run.timestamp/86400)
+    ORDER BY
+        floor(run.timestamp/86400)
+    """,
+    "select * from " + TEST_TABLE + " where a IN ('b', 'c')",
+    "select count() from " + TEST_TABLE
+]
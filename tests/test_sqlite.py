@@ -0,0 +1,148 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times import Date
+from pyLibrary.sql.sqlite import Sqlite, open_snapshot, sqlite_param
+
+
+class TestSqlite(FuzzyTestCase):
+    def setUp(self):
+        self.db = Sqlite(pragma={"synchronous": "OFF"})
+        with self.db.transaction() as t:
+            t.execute("CREATE TABLE a (name TEXT, num INTEGER, time REAL, flag TINYINT)")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_execute_many(self):
+        rows = [
+            ("it's", 1, Date(1500000000), True),
+            (None, 2, None, False),
+            ({"a": 1}, None, None, None)
+        ]
+        with self.db.transaction() as t:
+            t.execute_many(
+                "INSERT INTO a (name, num, time, flag) VALUES (?, ?, ?, ?)",
+                [tuple(sqlite_param(v) for v in r) for r in rows]
+            )
+        result = self.db.query("SELECT name, num, time, flag FROM a ORDER BY num")
+        self.assertEqual(
+            [list(r) for r in result.data],
+            [
+                [".", None, None, None],
+                ["it's", 1, 1500000000, 1],
+                [None, 2, None, 0]
+            ]
+        )
+
+    def test_pragma(self):
+        result = self.db.query("PRAGMA synchronous")
+        self.assertEqual(result.data[0][0], 0)
+
+    def test_query_timing(self):
+        result = self.db.query("SELECT count(1) FROM a")
+        self.assertGreaterEqual(result.meta.timing.wait, 0)
+        self.assertGreaterEqual(result.meta.timing.run, 0)
+
+
+class TestSqliteReaders(FuzzyTestCase):
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.db = Sqlite(filename=os.path.join(self.temp, "readers.sqlite"), readers=2)
+        with self.db.transaction() as t:
+            t.execute("CREATE TABLE a (num INTEGER)")
+            t.execute("INSERT INTO a VALUES (1)")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp, ignore_errors=True)
+
+    def test_read_from_pool(self):
+        result = self.db.query("SELECT num FROM a")
+        self.assertEqual(result.data, [(1,)])
+        self.assertEqual(self.db.query("PRAGMA journal_mode").data, [("wal",)])
+
+    def test_readers_see_commits(self):
+        with self.db.transaction() as t:
+            t.execute("INSERT INTO a VALUES (2)")
+        result = self.db.query("SELECT max(num) FROM a")
+        self.assertEqual(result.data, [(2,)])
+
+    def test_readers_are_read_only(self):
+        self.assertRaises("readonly", self.db.query, "INSERT INTO a VALUES (3)")
+
+
+class TestSqliteSnapshot(FuzzyTestCase):
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.db = Sqlite()
+        with self.db.transaction() as t:
+            t.execute("CREATE TABLE fact (_id TEXT, __id__ INTEGER, PRIMARY KEY (_id, __id__))")
+            t.execute("CREATE TABLE child (__id__ INTEGER PRIMARY KEY, __parent__ INTEGER, v REAL)")
+            t.execute("CREATE INDEX child_parent ON child (__parent__)")
+            t.execute("CREATE TABLE keyed (k TEXT NOT NULL, n INTEGER DEFAULT 7, u TEXT UNIQUE, PRIMARY KEY (k))")
+            t.execute("CREATE INDEX keyed_n ON keyed (n)")
+            t.execute_many("INSERT INTO keyed (k, u) VALUES (?, ?)", [("k" + str(i), "u" + str(i)) for i in range(10)])
+            t.execute_many("INSERT INTO fact VALUES (?, ?)", [("g" + str(i), i) for i in range(100)])
+            t.execute_many("INSERT INTO child VALUES (?, ?, ?)", [(i, i // 3, i / 2) for i in range(300)])
+        self.filename = os.path.join(self.temp, "snapshot.sqlite")
+        self.db.snapshot(self.filename)
+        self.snapshot = open_snapshot(self.filename, readers=2)
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.db.close()
+        shutil.rmtree(self.temp, ignore_errors=True)
+
+    def test_same_data(self):
+        for table in ["fact", "child"]:
+            expected = self.db.query("SELECT * FROM " + table + " ORDER BY __id__").data
+            result = self.snapshot.query("SELECT * FROM " + table + " ORDER BY __id__").data
+            self.assertEqual(result, expected)
+
+    def test_read_optimized(self):
+        tables = {
+            name: sql
+            for name, sql in self.snapshot.query("SELECT name, sql FROM sqlite_master WHERE type='table'").data
+        }
+        self.assertIn("WITHOUT ROWID", tables["fact"])
+        self.assertNotIn("WITHOUT ROWID", tables["child"])
+        self.assertIn("sqlite_stat1", tables)
+        indexes = self.snapshot.query("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='child'").data
+        self.assertEqual(indexes, [("child_parent",)])
+        self.assertGreater(self.snapshot.query("PRAGMA mmap_size").data[0][0], 0)
+
+    def test_constraints_kept(self):
+        create = self.snapshot.query("SELECT sql FROM sqlite_master WHERE type='table' AND name='keyed'").data[0][0]
+        self.assertIn("WITHOUT ROWID", create)
+        columns = {name: (notnull, default) for _, name, _, notnull, default, _ in self.snapshot.query("PRAGMA table_info(keyed)").data}
+        self.assertEqual(columns, {"k": (1, None), "n": (0, "7"), "u": (0, None)})
+        # ORIGIN OF EACH INDEX: c=CREATE INDEX, u=UNIQUE CONSTRAINT, pk=PRIMARY KEY
+        indexes = {origin: (name, unique) for _, name, unique, origin, _ in self.snapshot.query("PRAGMA index_list(keyed)").data}
+        self.assertEqual(set(indexes.keys()), {"c", "u", "pk"})
+        self.assertEqual(indexes["c"], ("keyed_n", 0))
+        self.assertEqual(indexes["u"][1], 1)
+        self.assertEqual(self.snapshot.query("SELECT count(1) FROM keyed WHERE n=7").data[0][0], 10)
+
+    def test_snapshot_is_read_only(self):
+        self.assertRaises("readonly", self.snapshot.query, "INSERT INTO child VALUES (1000, 1, 1)")
+
+    def test_no_wal(self):
+        self.snapshot.query("SELECT count(1) FROM child")
+        self.assertEqual(self.snapshot.query("PRAGMA journal_mode").data[0][0], "delete")
+        self.assertFalse(os.path.exists(self.filename + "-wal"))
+        self.assertFalse(os.path.exists(self.filename + "-shm"))
@@ -0,0 +1,104 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import active_data
+from active_data import record_request
+from active_data.actions.sql import parse_sql
+from active_data.telemetry import Histogram, Telemetry, query_shape
+from mo_dots import Data
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestTelemetry(FuzzyTestCase):
+    def test_percentiles(self):
+        h = Histogram()
+        for i in range(1, 1001):
+            h.add(i / 1000)  # 1ms TO 1s
+        self.assertEqual(h.count, 1000)
+        self.assertAlmostEqual(h.percentile(0.5), 0.5, places=2)
+        self.assertAlmostEqual(h.percentile(0.99), 0.99, places=2)
+        self.assertEqual(h.min, 0.001)
+        self.assertEqual(h.max, 1)
+        self.assertLess(len(h.buckets), 1000)
+
+    def test_merge(self):
+        a, b = Histogram(), Histogram()
+        a.add(0.1)
+        b.add(0.3)
+        b.add(0.2)
+        a.merge(b)
+        self.assertEqual(a.count, 3)
+        self.assertAlmostEqual(a.total, 0.6)
+        self.assertEqual((a.min, a.max), (0.1, 0.3))
+
+    def test_shape_ignores_literals(self):
+        a = query_shape({"from": "unittest", "where": {"eq": {"build.type": "opt"}}, "limit": 10})
+        b = query_shape({"from": "unittest", "where": {"eq": {"build.type": "debug"}}})
+        c = query_shape({"from": "unittest", "where": {"eq": {"build.platform": "opt"}}})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_sql_shape_ignores_literals(self):
+        a = query_shape(parse_sql("SELECT a FROM unittest WHERE b='x' AND c IN (1, 2) AND d > 3 LIMIT 10"))
+        b = query_shape(parse_sql("select a from unittest where b = 'y' and c in (5, 6) and d > 4"))
+        c = query_shape(parse_sql("SELECT a FROM unittest WHERE e='x' AND c IN (1, 2) AND d > 3"))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_sql_request_shape(self):
+        added = []
+
+        class Recorder(object):
+            def add(self, path, table, shape, duration):
+                added.append((path, table, shape))
+
+            def should_log(self, duration, error):
+                return False
+
+        queue, telemetry = active_data.request_log_queue, active_data.telemetry
+        active_data.request_log_queue, active_data.telemetry = [], Recorder()
+        try:
+            for sql in ["SELECT a FROM unittest WHERE b='x'", "SELECT a FROM unittest WHERE b='y'"]:
+                record_request(Data(path="/sql"), {"sql": sql}, None, None, duration=0.1, jx_query=parse_sql(sql))
+        finally:
+            active_data.request_log_queue, active_data.telemetry = queue, telemetry
+
+        self.assertEqual(len(added), 2)
+        self.assertEqual(added[0], ("/sql", "unittest", added[1][2]))
+
+    def test_flush(self):
+        sent = []
+
+        class Queue(object):
+            def add(self, value):
+                sent.append(value)
+
+        telemetry = Telemetry(queue=Queue(), rate=0, slow="second", interval="hour")
+        try:
+            telemetry.add("/query", "unittest", "abc", 0.2)
+            telemetry.add("/query", "unittest", "abc", 0.4)
+            telemetry.add("/sql", None, "def", 0.1)
+            self.assertTrue(telemetry.should_log(2, None))
+            self.assertTrue(telemetry.should_log(0.1, "error"))
+            self.assertFalse(telemetry.should_log(0.1, None))
+
+            self.assertEqual(telemetry.flush(), 2)
+            self.assertEqual(
+                sent,
+                [
+                    {"value": {"path": "/query", "from": "unittest", "query_shape": "abc", "latency": {"count": 2, "max": 0.4}}},
+                    {"value": {"path": "/sql", "query_shape": "def", "latency": {"count": 1}}}
+                ]
+            )
+            self.assertEqual(telemetry.flush(), 0)
+        finally:
+            telemetry.stop()
@@ -0,0 +1,48 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times.timer import Timer, current_span
+
+
+class TestTimer(FuzzyTestCase):
+    def test_no_trace(self):
+        with Timer("outer", silent=True) as timer:
+            with Timer("inner", silent=True):
+                self.assertIsNone(current_span())
+        self.assertIsNone(timer.span)
+
+    def test_trace_tree(self):
+        with Timer("translate", silent=True, trace=True) as timer:
+            with Timer("find_container", silent=True):
+                pass
+            with Timer("es_search", silent=True):
+                with Timer("parse_response", silent=True):
+                    pass
+            with Timer("es_search", silent=True):
+                pass
+        self.assertIsNone(current_span())
+
+        self.assertEqual(
+            timer.span.__data__(),
+            {
+                "name": "translate",
+                "children": [
+                    {"name": "find_container"},
+                    {"name": "es_search", "children": [{"name": "parse_response"}]},
+                    {"name": "es_search"}
+                ]
+            }
+        )
+        stats = timer.span.stats()
+        self.assertEqual(set(stats.keys()), {"translate", "find_container", "es_search", "parse_response"})
+        self.assertGreaterEqual(stats["translate"], stats["es_search"])
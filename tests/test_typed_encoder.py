@@ -0,0 +1,109 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from copy import deepcopy
+
+from mo_dots import Data, wrap
+from mo_json import json2value
+from mo_json.encoder import UnicodeBuilder
+from mo_json.typed_encoder import NESTED_TYPE, ShapeEncoder, typed_encode, untyped
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times.timer import Timer
+
+
+def sample_result(i):
+    return {
+        "build": {"branch": "mozilla-central", "platform": "linux64", "revision": "%040x" % i},
+        "run": {"suite": "mochitest", "chunk": i % 20, "retry": bool(i % 7 == 0)},
+        "result": {
+            "test": "dom/tests/test_" + str(i) + ".html",
+            "ok": i % 13 != 0,
+            "duration": i / 8,
+            "message": "line \"" + str(i) + "\"\n\ttab é☃\x01" if i % 3 else ""
+        },
+        "_id": None
+    }
+
+
+def generic(value, schema):
+    buffer = UnicodeBuilder(1024)
+    typed_encode(value, schema, [], [], buffer)
+    return buffer.build()
+
+
+def fast(encoder, value):
+    buffer = UnicodeBuilder(1024)
+    encoder.encode(value, [], buffer)
+    return buffer.build()
+
+
+class TestTypedEncoder(FuzzyTestCase):
+    def test_same_as_generic(self):
+        docs = [sample_result(i) for i in range(100)]
+        docs.extend([
+            {"a": 1, "b": {"c": "x"}},
+            {"a": 1.5, "b": {"c": "y", "d": False}},
+            {"a": [1, 2], "b": {}},
+            {"a": {}, "b": {"c": None}},
+            {"a": "", "b": {"c": ""}},
+            {"a.b,c": -0.0, "long": 2 ** 70},
+            Data(a=2, b={"c": "z"}),
+        ])
+        schema = {}
+        encoder = ShapeEncoder({})
+        for d in docs:
+            self.assertEqual(fast(encoder, deepcopy(d)), generic(deepcopy(d), schema))
+        self.assertEqual(encoder.schema, schema)
+        self.assertGreater(encoder.fast, 90)
+
+    def test_round_trip(self):
+        encoder = ShapeEncoder({})
+        for i in range(3):
+            doc = sample_result(i)
+            typed = json2value(fast(encoder, doc))
+            expected = wrap(doc)
+            expected._id = None
+            if not expected.result.message:
+                expected.result.message = None
+            self.assertEqual(untyped(typed), expected)
+
+    def test_schema_change(self):
+        # ONCE "a" IS NESTED, AN OBJECT IN "a" IS ENCODED AS A LIST
+        encoder = ShapeEncoder({})
+        fast(encoder, {"a": {"b": 1}})
+        fast(encoder, {"a": {"b": 2}})
+        fast(encoder, {"a": [{"b": 1}, {"b": 2}]})
+        self.assertIn(NESTED_TYPE, encoder.schema["a"])
+
+        schema = deepcopy(encoder.schema)
+        self.assertEqual(fast(encoder, {"a": {"b": 3}}), generic({"a": {"b": 3}}, schema))
+        self.assertIn(NESTED_TYPE, fast(encoder, {"a": {"b": 3}}))
+
+    def test_speed(self):
+        docs = [sample_result(i) for i in range(20000)]
+
+        with Timer("generic typed_encode") as generic_time:
+            schema = {}
+            for d in docs:
+                generic(d, schema)
+        with Timer("shape specialized typed_encode") as fast_time:
+            encoder = ShapeEncoder({})
+            for d in docs:
+                fast(encoder, d)
+
+        Log.note(
+            "generic {{generic}}, specialized {{fast}} ({{ratio|round(places=2)}}x faster)",
+            generic=generic_time.duration,
+            fast=fast_time.duration,
+            ratio=generic_time.duration.seconds / fast_time.duration.seconds
+        )